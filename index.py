@@ -3,10 +3,94 @@ try:
 except ImportError:
     from stub import Node, GeneratorNode, ConditionalNode, register_node
 
-from typing import Dict, Any, Generator, List
+from typing import Dict, Any, Iterator, Tuple
+import asyncio
 import os
 import re
-import json
+import sys
+import mmap
+import stat
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+# i18n文件对象字面量的词法规则(按字节匹配mmap), 每次match跳过空白与注释后识别一个记号;
+# 常见的 key: 'value' 与 key: { 作为一个记号匹配(kstring/kopen), 每行只需一次match;
+# 无法识别的非空白字符匹配为bad, 使finditer得到的记号首尾相接, 由调用方报错;
+# 只剩空白时finditer直接结束, 由调用方报告内容意外结束
+_KEY = rb"""'[^'\n]*'|"[^"\n]*"|[\w$\x80-\xff]+"""
+_STRING = rb"""'[^'\\\n]*(?:\\.[^'\\\n]*)*'|"[^"\\\n]*(?:\\.[^"\\\n]*)*"|`[^`\\]*(?:\\.[^`\\]*)*`"""
+# 数字/布尔/函数等其他值: 字符串、块注释和两层以内的括号作为整体跳过, 其中的 } , 不会提前结束该值
+_GROUP_TEMPLATE = rb"""\((?:%s|[^()'"`])*\)|\{(?:%s|[^{}'"`])*\}|\[(?:%s|[^\[\]'"`])*\]"""
+_GROUP = _GROUP_TEMPLATE % ((_STRING + rb"|" + _GROUP_TEMPLATE % ((_STRING,) * 3),) * 3)
+_OTHER = rb"""(?:%s|[^\s,}\])'"`/{\[]|/(?![/*]))(?:%s|%s|/\*[\s\S]*?\*/|[^,}\])'"`/{(\[]|/(?![/*]))*""" % (
+    _GROUP, _STRING, _GROUP
+)
+_TOKEN_RE = re.compile(
+    rb"""(?:\s+|//[^\n]*|/\*[\s\S]*?\*/)*
+    (?:
+        (?P<close>[}\]])\s*,?
+      | (?P<key>%s)\s*:
+        (?:\s*(?:(?P<kstring>%s)\s*,?|(?P<kopen>[{\[])))?
+      | (?P<open>[{\[])
+      | (?P<string>%s)\s*,?
+      | (?P<other>%s),?
+      | (?P<bad>\S)
+    )""" % (_KEY, _STRING, _STRING, _OTHER),
+    re.VERBOSE,
+)
+_KEY_RE = re.compile(_KEY)
+# 根对象结束后只允许空白、注释、as const 和分号
+_TRAILER_RE = re.compile(rb"(?:\s+|//[^\n]*|/\*[\s\S]*?\*/)*(?:as\s+const\b)?(?:\s+|//[^\n]*|/\*[\s\S]*?\*/|;)*")
+_EXPORT_DEFAULT_RE = re.compile(rb"export\s+default\s*(?=\{)")
+
+# 预先生成的缩进(types.ts按字节写出), 超出深度时再临时拼接
+_MAX_INDENT = 64
+_INDENTS = tuple(b"  " * i for i in range(_MAX_INDENT))
+
+
+def _token_error(s: bytes, m: "re.Match") -> ValueError:
+    """key的位置出现了其他记号: 能识别出key时说明缺少冒号, 否则为非法key"""
+    pos = m.start(m.lastgroup)
+    key = _KEY_RE.match(s, pos)
+    if key:
+        return ValueError(f"Expected ':' at position {key.end()}")
+    return ValueError(f"Invalid key at position {pos}")
+
+
+def _check_trailer(s: bytes, i: int) -> None:
+    """确认s[i]之后只剩空白/注释/as const/分号, 否则说明根对象提前结束"""
+    end = _TRAILER_RE.match(s, i).end()
+    if end != len(s):
+        raise ValueError(f"Unexpected content after the root object at position {end}")
+
+
+def _output_mode(path: str) -> int:
+    """输出文件的权限: 沿用已有文件的权限, 新建时与open()一致, 即0o666去掉umask"""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+@contextmanager
+def _map_file(f) -> Iterator[bytes]:
+    """只读映射已打开的文件, 空文件或管道等无法映射的文件退回一次性读取"""
+    try:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        # 不在except中yield, 否则调用方抛出的异常会被串联到映射失败上
+        mm = None
+    if mm is None:
+        # 按文件大小预分配一次读完, 避免读取缓冲区反复扩容; 管道等大小未知时读到结束
+        yield f.read(os.fstat(f.fileno()).st_size or -1)
+        return
+    with mm:
+        yield mm
 
 
 @register_node
@@ -44,24 +128,27 @@ class GenerateTypesTS(Node):
 
             workflow_logger.info(f"Reading zh.ts file from: {zh_ts_file}")
 
-            # 读取zh.ts文件内容
-            with open(zh_ts_file, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            # 提取接口结构
-            interface_content = self._generate_interface(content)
-
-            # 生成完整的types.ts内容
-            types_content = f"""export interface I18nMessages {interface_content}
-
-"""
-            # 确保输出目录存在
-            os.makedirs(output_dir, exist_ok=True)
-
-            # 写入types.ts文件
-            output_file = os.path.join(output_dir, "types.ts")
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(types_content)
+            with open(zh_ts_file, "rb") as src, _map_file(src) as mm:
+                # 确保输出目录存在
+                os.makedirs(output_dir, exist_ok=True)
+
+                # 边解析边写入独立的临时文件, 不在内存中拼接完整内容; 成功后再替换types.ts,
+                # 解析失败时原有的types.ts保持不变. types.ts是符号链接时替换其指向的文件
+                output_file = os.path.join(output_dir, "types.ts")
+                target_file = os.path.realpath(output_file)
+                fd, tmp_file = tempfile.mkstemp(
+                    dir=os.path.dirname(target_file), prefix=".types.", suffix=".ts"
+                )
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(b"export interface I18nMessages {\n")
+                        f.writelines(self._generate_interface(mm))
+                        f.write(b"}\n\n")
+                    os.chmod(tmp_file, _output_mode(target_file))
+                    os.replace(tmp_file, target_file)
+                except BaseException:
+                    os.remove(tmp_file)
+                    raise
 
             workflow_logger.info(f"Successfully generated types.ts at: {output_file}")
 
@@ -71,52 +158,78 @@ class GenerateTypesTS(Node):
             workflow_logger.error(f"Failed to generate types.ts: {str(e)}")
             return {"success": False, "error_message": str(e)}
 
-    def _generate_interface(self, content: str) -> str:
-        """根据zh.ts内容生成TypeScript接口定义"""
-        def parse_ts_object(content: str) -> List[str]:
-            """直接解析TypeScript对象为接口定义行"""
-            lines = []
-            indent_level = 0
-            
-            for line in content.split('\n'):
-                line = line.strip()
-                if not line or line == 'export default {':
-                    continue
-                    
-                # 处理对象结束
-                if line in ['}', '},']:
-                    indent_level -= 1
-                    if indent_level >= 0:  # 避免最外层的结束括号
-                        lines.append("  " * indent_level + "}")
-                    continue
-                    
-                # 处理键值对
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    key = key.strip().strip("'").strip('"')
-                    value = value.strip().rstrip(',')
-                    
-                    indent_str = "  " * indent_level
-                    
-                    # 处理嵌套对象
-                    if value.strip() == '{':
-                        lines.append(f"{indent_str}{key}: {{")
-                        indent_level += 1
-                    # 处理字符串值
-                    elif value.strip().startswith("'") or value.strip().startswith('"'):
-                        lines.append(f"{indent_str}{key}: string")
-                    
-            return lines
-
-        # 提取export default后的对象内容
-        match = re.search(r'export\s+default\s+({[\s\S]+})', content)
+    def _generate_interface(self, content: bytes) -> Iterator[bytes]:
+        """根据zh.ts内容逐行生成TypeScript接口定义的成员(UTF-8字节, 含换行)"""
+        # 定位export default后的对象起始位置
+        match = _EXPORT_DEFAULT_RE.search(content)
         if not match:
             raise ValueError("Invalid zh.ts file format")
-        
-        obj_content = match.group(1)
-        interface_lines = parse_ts_object(obj_content)
-        
-        return "{\n" + "\n".join(line for line in interface_lines if line.strip()) + "\n}"
+
+        yield from self._parse(content, match.end())
+
+    def _parse(self, s: bytes, i: int) -> Iterator[bytes]:
+        """从s[i]处的对象起始括号开始单次扫描, 逐行生成接口定义直到根对象结束"""
+        level = -1  # 尚未进入根对象
+        skip = 0  # 数组等非对象值的嵌套深度, 其内容不生成接口
+        indent = b""
+        key = None
+
+        for m in _TOKEN_RE.finditer(s, i):
+            kind = m.lastgroup
+            if kind == "bad":
+                raise ValueError(f"Unexpected token at position {m.start(kind)}")
+
+            # 绝大多数记号是 key: 'value', 优先处理; key直接取原始字节, 无需解码再编码
+            if kind == "kstring" and key is None and not skip:
+                yield indent + m.group("key").strip(b"'\"") + b": string\n"
+                continue
+
+            if skip:
+                if kind == "open" or kind == "kopen":
+                    skip += 1
+                elif kind == "close":
+                    skip -= 1
+                continue
+
+            # 字符串/其他值只能出现在key之后, 否则报错而不是静默丢弃
+            if kind == "key" or kind == "kstring" or kind == "kopen":
+                if key is not None:
+                    raise ValueError(f"Unexpected token at position {m.start('key')}")
+                key = m.group("key").strip(b"'\"")
+                if kind == "key":
+                    continue
+
+            if kind == "string" or kind == "kstring":
+                if key is None:
+                    raise _token_error(s, m)
+                yield indent + key + b": string\n"
+            elif kind == "open" or kind == "kopen":
+                if level < 0:
+                    level = 0
+                elif key is None:
+                    raise _token_error(s, m)
+                elif m.group(kind) == b"[":
+                    skip = 1
+                else:
+                    yield indent + key + b": {\n"
+                    level += 1
+                    indent = _INDENTS[level] if level < _MAX_INDENT else b"  " * level
+            elif kind == "close":
+                if m.group(kind) == b"]":
+                    raise _token_error(s, m)
+                if key is not None:
+                    raise ValueError(f"Expected value at position {m.start(kind)}")
+                level -= 1
+                if level < 0:
+                    _check_trailer(s, m.end())
+                    return
+                indent = _INDENTS[level] if level < _MAX_INDENT else b"  " * level
+                yield indent + b"}\n"
+            elif key is None:
+                raise _token_error(s, m)
+            key = None
+
+        raise ValueError("Unexpected end of zh.ts content")
 
 
 @register_node
@@ -152,52 +265,126 @@ class CompareI18nKeys(Node):
         }
     }
 
-    def _extract_keys(self, content: str) -> set:
-        """提取ts文件中所有的key"""
-        import json
-        keys = set()
-        
-        def collect_keys(obj: dict, prefix=""):
-            """递归收集所有key"""
-            for key, value in obj.items():
-                full_key = f"{prefix}.{key}" if prefix else key
-                if isinstance(value, dict):
-                    collect_keys(value, full_key)
-                else:
-                    keys.add(full_key)
-            return keys
+    # 按(路径, 修改时间, 大小)缓存已解析的key集合, 跨多次执行共享
+    _KEY_CACHE_SIZE = 32
+    _key_cache: "OrderedDict[Tuple[str, int, int], frozenset]" = OrderedDict()
+    _key_cache_lock = threading.Lock()
 
+    def _extract_keys(self, content: bytes) -> set:
+        """提取ts文件中所有的key, content可以是bytes或mmap"""
         try:
-            # 提取export default后的对象内容
-            match = re.search(r'export\s+default\s+({[\s\S]+})\s*$', content)
+            # 定位export default后的对象起始位置
+            match = _EXPORT_DEFAULT_RE.search(content)
             if not match:
                 raise ValueError("Invalid i18n file format: missing 'export default'")
-                
-            # 将ts对象转换为合法的JSON格式
-            obj_content = match.group(1)
-            
-            # 处理TypeScript对象格式
-            # 1. 处理key (确保所有key都有引号)
-            obj_content = re.sub(r'(?m)^(\s*)(\w+):', r'\1"\2":', obj_content)
-            
-            # 2. 处理字符串值 (将单引号转换为双引号)
-            obj_content = re.sub(r"'([^']*)'", r'"\1"', obj_content)
-            
-            # 3. 移除尾随逗号
-            obj_content = re.sub(r',(\s*[}\]])', r'\1', obj_content)
-            
-            try:
-                i18n_dict = json.loads(obj_content)
-                return collect_keys(i18n_dict)
-            except json.JSONDecodeError as e:
-                workflow_logger.error(f"JSON parsing error: {str(e)}")
-                workflow_logger.error(f"Processed content: {obj_content}")
-                raise ValueError(f"Failed to parse i18n content: {str(e)}")
-                
+
+            keys = set()
+            stack = []  # 外层对象的前缀
+            prefix = ""
+            depth = 0  # 对象嵌套深度, 0表示尚未进入根对象
+            skip = 0  # 数组值的嵌套深度, 其内容不收集key
+            full_key = None  # 等待取值的key
+
+            # 与GenerateTypesTS共用同一词法规则, 每个记号只做一次match
+            for m in _TOKEN_RE.finditer(content, match.end()):
+                kind = m.lastgroup
+                if kind == "bad":
+                    raise ValueError(f"Unexpected token at position {m.start(kind)}")
+
+                if skip:
+                    if kind == "open" or kind == "kopen":
+                        skip += 1
+                    elif kind == "close":
+                        skip -= 1
+                    continue
+
+                # 值只能出现在key之后, 否则报错, 避免不合法的条目被静默丢弃
+                if kind == "key" or kind == "kstring" or kind == "kopen":
+                    if full_key is not None:
+                        raise ValueError(f"Unexpected token at position {m.start('key')}")
+                    # 只对key切片解码, 值不做解码; 重复出现的key名共享同一字符串对象
+                    key = sys.intern(m.group("key").strip(b"'\"").decode("utf-8"))
+                    full_key = f"{prefix}.{key}" if prefix else key
+                    if kind == "key":
+                        continue
+
+                if kind == "open" or kind == "kopen":
+                    if not depth:
+                        depth = 1
+                    elif full_key is None:
+                        raise _token_error(content, m)
+                    elif m.group(kind) == b"[":
+                        keys.add(full_key)
+                        skip = 1
+                    else:
+                        stack.append(prefix)
+                        prefix = full_key
+                        depth += 1
+                elif kind == "close":
+                    if m.group(kind) == b"]":
+                        raise _token_error(content, m)
+                    if full_key is not None:
+                        raise ValueError(f"Expected value at position {m.start(kind)}")
+                    depth -= 1
+                    if depth <= 0:
+                        _check_trailer(content, m.end())
+                        return keys
+                    prefix = stack.pop()
+                elif full_key is None:
+                    raise _token_error(content, m)
+                else:
+                    keys.add(full_key)
+                full_key = None
+
+            raise ValueError("Unexpected end of content")
+
         except Exception as e:
-            workflow_logger.error(f"Error extracting keys: {str(e)}")
             raise ValueError(f"Failed to process i18n file: {str(e)}")
 
+    def _read_and_parse(self, path: str) -> frozenset:
+        """映射文件内容并提取所有key, 文件未变化时直接复用缓存结果"""
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            cache_key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+            with self._key_cache_lock:
+                keys = self._key_cache.get(cache_key)
+                if keys is not None:
+                    self._key_cache.move_to_end(cache_key)
+                    return keys
+
+            with _map_file(f) as mm:
+                keys = frozenset(self._extract_keys(mm))
+
+        with self._key_cache_lock:
+            self._key_cache[cache_key] = keys
+            if len(self._key_cache) > self._KEY_CACHE_SIZE:
+                self._key_cache.popitem(last=False)
+        return keys
+
+    def _compare_keys(self, keys1: frozenset, keys2: frozenset, file1_name: str, file2_name: str, workflow_logger) -> Tuple[bool, list, list]:
+        """比较两个key集合, 返回是否一致、文件2缺失的key及文件1缺失的key"""
+        # 比较key (set比较会先比较长度), 一致时无需计算差集和排序
+        is_identical = keys1 == keys2
+        if is_identical:
+            missing_in_2 = []
+            missing_in_1 = []
+        else:
+            # 一次对称差得到所有不一致的key, 再按归属拆分
+            diff = keys1 ^ keys2
+            missing_in_2 = sorted([k for k in diff if k in keys1])
+            missing_in_1 = sorted([k for k in diff if k not in keys1])
+
+        if not is_identical:
+            workflow_logger.warning(f"Found mismatched keys between {file1_name} and {file2_name}")
+            if missing_in_2:
+                workflow_logger.warning(f"Keys missing in {file2_name}: {missing_in_2}")
+            if missing_in_1:
+                workflow_logger.warning(f"Keys missing in {file1_name}: {missing_in_1}")
+        else:
+            workflow_logger.info(f"All keys match between {file1_name} and {file2_name}")
+
+        return is_identical, missing_in_2, missing_in_1
+
     async def execute(self, node_inputs: Dict[str, Any], workflow_logger) -> Dict[str, Any]:
         try:
             file1 = node_inputs["first_file"]
@@ -205,27 +392,21 @@ class CompareI18nKeys(Node):
 
             workflow_logger.info(f"Comparing i18n files: {file1} and {file2}")
 
-            # 读取两个文件内容
-            with open(file1, "r", encoding="utf-8") as f:
-                content1 = f.read()
-            with open(file2, "r", encoding="utf-8") as f:
-                content2 = f.read()
-
             # 提取文件名
             file1_name = os.path.basename(file1)
             file2_name = os.path.basename(file2)
 
-            # 提取两个文件的所有key
-            keys1 = self._extract_keys(content1)
-            keys2 = self._extract_keys(content2)
-
-            # 比较key
-            missing_in_2 = sorted(list(keys1 - keys2))
-            missing_in_1 = sorted(list(keys2 - keys1))
-            
-            is_identical = len(missing_in_1) == 0 and len(missing_in_2) == 0
-            
-            result = {
+            # 在线程中并发读取并提取两个文件的所有key
+            keys1, keys2 = await asyncio.gather(
+                asyncio.to_thread(self._read_and_parse, file1),
+                asyncio.to_thread(self._read_and_parse, file2),
+            )
+
+            is_identical, missing_in_2, missing_in_1 = self._compare_keys(
+                keys1, keys2, file1_name, file2_name, workflow_logger
+            )
+
+            return {
                 "is_identical": is_identical,
                 "missing_keys": {
                     f"missing_in_{file2_name}": missing_in_2,
@@ -233,20 +414,72 @@ class CompareI18nKeys(Node):
                 }
             }
 
-            if not is_identical:
-                workflow_logger.warning(f"Found mismatched keys between {file1_name} and {file2_name}")
-                if missing_in_2:
-                    workflow_logger.warning(f"Keys missing in {file2_name}: {missing_in_2}")
-                if missing_in_1:
-                    workflow_logger.warning(f"Keys missing in {file1_name}: {missing_in_1}")
-            else:
-                workflow_logger.info(f"All keys match between {file1_name} and {file2_name}")
-
-            return result
-
         except Exception as e:
             workflow_logger.error(f"Failed to compare i18n files: {str(e)}")
             raise ValueError(f"Failed to compare i18n files: {str(e)}")
 
 
+@register_node
+class BatchCompareI18nKeys(CompareI18nKeys):
+    NAME = "批量比较国际化文件"
+    DESCRIPTION = "以一个国际化文件为基准, 批量比较其他文件的key是否一致"
+
+    INPUTS = {
+        "first_file": {
+            "label": "基准文件路径",
+            "description": "作为比较基准的国际化文件路径",
+            "type": "STRING",
+            "required": True,
+        },
+        "other_files": {
+            "label": "其他文件路径",
+            "description": "需要与基准文件比较的国际化文件路径列表",
+            "type": "LIST",
+            "required": True,
+        }
+    }
+
+    OUTPUTS = {
+        "is_identical": {
+            "label": "是否一致",
+            "description": "所有文件的key是否都与基准文件完全一致",
+            "type": "BOOLEAN",
+        },
+        "missing_keys": {
+            "label": "缺失的key",
+            "description": "按文件路径分组, 每组包含该文件缺失的key(missing_in_target)和基准文件缺失的key(missing_in_reference)",
+            "type": "DICT",
+        }
+    }
 
+    async def execute(self, node_inputs: Dict[str, Any], workflow_logger) -> Dict[str, Any]:
+        try:
+            ref_file = node_inputs["first_file"]
+            other_files = node_inputs["other_files"]
+
+            workflow_logger.info(f"Comparing {len(other_files)} i18n files against: {ref_file}")
+
+            # 基准文件只解析一次, 与其他文件一起在线程池中并发解析
+            ref_keys, *other_keys = await asyncio.gather(
+                asyncio.to_thread(self._read_and_parse, ref_file),
+                *(asyncio.to_thread(self._read_and_parse, path) for path in other_files),
+            )
+
+            is_identical = True
+            missing_keys = {}
+            for path, keys in zip(other_files, other_keys):
+                # 不同语言目录下的文件常常同名, 组内使用固定名称而不是文件名
+                identical, missing_in_target, missing_in_reference = self._compare_keys(
+                    ref_keys, keys, ref_file, path, workflow_logger
+                )
+                is_identical = is_identical and identical
+                missing_keys[path] = {
+                    "missing_in_target": missing_in_target,
+                    "missing_in_reference": missing_in_reference,
+                }
+
+            return {"is_identical": is_identical, "missing_keys": missing_keys}
+
+        except Exception as e:
+            workflow_logger.error(f"Failed to compare i18n files: {str(e)}")
+            raise ValueError(f"Failed to compare i18n files: {str(e)}")